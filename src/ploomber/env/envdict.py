@@ -1,8 +1,11 @@
+import os
 from copy import copy, deepcopy
 import importlib
+from functools import lru_cache
 from pathlib import Path
 from collections.abc import Mapping
 from reprlib import Repr
+from types import MappingProxyType
 
 import yaml
 
@@ -11,6 +14,49 @@ from ploomber.env.expand import EnvironmentExpander
 from ploomber.env.frozenjson import FrozenJSON
 from ploomber.util import default
 
+# use the libyaml C parser when available, it's much faster than the pure
+# Python implementation
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader
+
+# used to display EnvDict objects, it truncates long dictionaries
+_REPR = Repr()
+
+# returned by dict.get to distinguish missing keys from None values
+_MISSING = object()
+
+# maps a working directory to the project root found from it
+_ROOT_FOUND = {}
+
+# maps a (working directory, module name) tuple to the module's origin (only
+# for modules that were found)
+_MODULE_ORIGIN = {}
+
+
+def _make_default_dict(include_here, include_root):
+    placeholders = {
+        'user': '{{user}}',
+        'cwd': '{{cwd}}',
+        'now': '{{now}}',
+    }
+
+    if include_root:
+        placeholders['root'] = '{{root}}'
+
+    if include_here:
+        placeholders['here'] = '{{here}}'
+
+    return placeholders
+
+
+# default placeholders, keys are (include_here, include_root)
+_DEFAULT_DICTS = {(include_here, include_root):
+                  _make_default_dict(include_here, include_root)
+                  for include_here in (True, False)
+                  for include_root in (True, False)}
+
 
 # TODO: custom expanders, this could be done trough another special directive
 # such as _expander_class to know which class to use
@@ -41,6 +87,16 @@ class EnvDict(Mapping):
     {{cwd}} (working directory), {{here}} (env.yaml location, if any), {{root}}
     (project's root folder, if any)
     """
+    __slots__ = (
+        '_path_to_env',
+        '_preprocessed',
+        '_expander',
+        '_data',
+        '_default_keys',
+        '_resolved',
+        '_repr_cache',
+    )
+
     def __init__(self, source, path_to_here=None, defaults=None):
 
         # if initialized from another EnvDict, copy the attributes to
@@ -49,16 +105,7 @@ class EnvDict(Mapping):
         # because it needs to create one and then replace cli args, then
         # passes this modified object to DAGSpec
         if isinstance(source, EnvDict):
-            for attr in (
-                    '_path_to_env',
-                    '_preprocessed',
-                    '_expander',
-                    '_data',
-                    '_repr',
-                    '_default_keys',
-            ):
-                original = getattr(source, attr)
-                setattr(self, attr, deepcopy(original))
+            self._copy_from(source)
         else:
             (
                 # load data
@@ -66,20 +113,27 @@ class EnvDict(Mapping):
                 # this will be None if source is a dict
                 self._path_to_env) = load_from_source(source)
 
-            if defaults:
-                raw_data = {**defaults, **raw_data}
+            defaults = defaults or {}
+            provided = raw_data.keys() | defaults.keys()
 
             # add default placeholders but override them if they are defined
-            # in the raw data
-            default = self._default_dict(include_here=path_to_here is not None)
-            self._default_keys = set(default) - set(raw_data)
-            raw_data = {**default, **raw_data}
+            # in defaults or in the raw data. only look for the project root
+            # if the user did not pass root
+            data = self._default_dict(include_here=path_to_here is not None,
+                                      include_root='root' not in provided)
+            self._default_keys = set(data) - provided
+
+            # _default_dict returns a new dictionary, so we update it in place
+            # instead of merging everything into a new one
+            data.update(defaults)
+            data.update(raw_data)
+            raw_data = data
 
             # check raw data is ok
             validate.raw_data_keys(raw_data)
 
             # expand _module special key, return its expanded value
-            self._preprocessed = raw_preprocess(raw_data, self._path_to_env)
+            preprocessed = raw_preprocess(raw_data, self._path_to_env)
 
             # initialize expander, which converts placeholders to their values
             # we need to pass path_to_env since the {{here}} placeholder
@@ -91,12 +145,69 @@ class EnvDict(Mapping):
             else:
                 path_to_here = Path(path_to_here).resolve()
 
-            self._expander = EnvironmentExpander(self._preprocessed,
+            self._expander = EnvironmentExpander(preprocessed,
                                                  path_to_here=path_to_here)
-            # now expand all values
-            self._data = self._expander.expand_raw_dictionary(raw_data)
 
-            self._repr = Repr()
+            # now expand all values. _data and _preprocessed are read-only
+            # so copies can share them, methods that modify values replace
+            # them with updated versions (see _replace_value)
+            self._data = MappingProxyType(
+                self._expander.expand_raw_dictionary(raw_data))
+            self._preprocessed = MappingProxyType(preprocessed)
+            # dictionaries are wrapped in FrozenJSON objects on first access
+            self._resolved = {}
+            self._repr_cache = None
+
+    def _copy_from(self, other):
+        """
+        Initialize attributes from another EnvDict. Attributes are shared
+        since they are not modified in place
+        """
+        self._path_to_env = other._path_to_env
+        self._expander = other._expander
+        self._repr_cache = other._repr_cache
+        self._default_keys = other._default_keys
+        self._preprocessed = other._preprocessed
+        self._data = other._data
+        self._resolved = dict(other._resolved)
+
+    def _invalidate(self, key):
+        """Discard the FrozenJSON object for a key whose value changed
+        """
+        self._resolved.pop(key, None)
+        self._repr_cache = None
+
+    def __getstate__(self):
+        # FrozenJSON objects cannot be pickled, they are created again on
+        # first access after loading
+        state = {
+            attr: getattr(self, attr)
+            for attr in self.__slots__ if attr != '_resolved'
+        }
+        # same for mappingproxy objects
+        state['_data'] = dict(self._data)
+        state['_preprocessed'] = dict(self._preprocessed)
+        return state
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
+        self._data = MappingProxyType(self._data)
+        self._preprocessed = MappingProxyType(self._preprocessed)
+        self._resolved = {}
+
+    def __copy__(self):
+        obj = type(self).__new__(type(self))
+        obj._copy_from(self)
+        return obj
+
+    def __deepcopy__(self, memo):
+        # unlike copies, deep copies do not share nested values
+        obj = self.__copy__()
+        obj._data = MappingProxyType(deepcopy(dict(self._data), memo))
+        obj._resolved = {}
+        return obj
 
     @classmethod
     def find(cls, source):
@@ -124,34 +235,29 @@ class EnvDict(Mapping):
         return self._default_keys
 
     @staticmethod
-    def _default_dict(include_here):
-        placeholders = {
-            'user': '{{user}}',
-            'cwd': '{{cwd}}',
-            'now': '{{now}}',
-        }
-
-        if default.try_to_find_root_recursively() is not None:
-            placeholders['root'] = '{{root}}'
-
-        if include_here:
-            placeholders['here'] = '{{here}}'
-
-        return placeholders
+    def _default_dict(include_here, include_root=True):
+        include_root = bool(include_root and _root_found())
+        return dict(_DEFAULT_DICTS[(bool(include_here), include_root)])
 
     @property
     def path_to_env(self):
         return self._path_to_env
 
     def __getattr__(self, key):
-        error = AttributeError("'{}' object has no attribute '{}'".format(
-            type(self).__name__, key))
         # do not look up special atttributes this way!
-        if key.startswith('__') and key.endswith('__'):
-            raise error
-
-        if key in self:
-            return self[key]
+        if key[:2] == '__' == key[-2:]:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, key))
+
+        # use object.__getattribute__ so this raises an AttributeError
+        # instead of calling __getattr__ again if _resolved does not
+        # exist yet (e.g., when unpickling)
+        value = object.__getattribute__(self, '_resolved').get(key, _MISSING)
+
+        if value is not _MISSING:
+            return value
+        elif key in self._data or key in self._preprocessed:
+            return self._getitem(key)
         else:
             raise AttributeError("{} object has no atttribute '{}'".format(
                 repr(self), key))
@@ -167,13 +273,25 @@ class EnvDict(Mapping):
             raise
 
     def _getitem(self, key):
-        if key in self._preprocessed:
-            return FrozenJSON(self._preprocessed[key])
-        else:
-            return FrozenJSON(self._data[key])
+        if key in self._resolved:
+            return self._resolved[key]
+
+        # preprocessed values (e.g., _module) take precedence over the
+        # expanded ones
+        values = (self._preprocessed
+                  if key in self._preprocessed else self._data)
+        value = FrozenJSON(values[key])
+
+        # only keep FrozenJSON objects, FrozenJSON returns a new list for
+        # sequences, which callers may modify
+        if isinstance(value, FrozenJSON):
+            self._resolved[key] = value
+
+        return value
 
     def __setitem__(self, key, value):
-        self._data[key] = value
+        self._data = MappingProxyType({**self._data, key: value})
+        self._invalidate(key)
 
     def __iter__(self):
         for k in self._data:
@@ -186,8 +304,11 @@ class EnvDict(Mapping):
         return str(self._data)
 
     def __repr__(self):
-        content = self._repr.repr_dict(self._data, level=2)
-        return f'{type(self).__name__}({content})'
+        if self._repr_cache is None:
+            content = _REPR.repr_dict(self._data, level=2)
+            self._repr_cache = f'{type(self).__name__}({content})'
+
+        return self._repr_cache
 
     def _replace_value(self, value, keys_all):
         """
@@ -197,21 +318,50 @@ class EnvDict(Mapping):
         e.g. given {'a': {'b': 1}}, we can replace 1 by doing
         _replace_value(2, ['a', 'b'])
         """
-        keys_to_final_dict = keys_all[:-1]
-        key_to_edit = keys_all[-1]
+        self._replace_values([(keys_all, value)])
+
+    def _replace_values(self, to_replace):
+        """
+        Replace multiple values in the underlying dictionary, by passing a
+        list of (keys, value) tuples. Values are only replaced if all keys
+        exist
+
+        e.g. given {'a': {'b': 1, 'c': 1}}, we can replace both values by
+        doing _replace_values([(['a', 'b'], 2), (['a', 'c'], 2)])
+        """
+        # _data may be shared with copies of this object, so we only modify
+        # copies of the dictionaries in the paths to the values we are
+        # editing. we keep track of the ones we copied so we copy each one
+        # once even if we replace many values in it
+        data = dict(self._data)
+        copied = set()
+
+        for keys_all, value in to_replace:
+            keys_to_final_dict = keys_all[:-1]
+            key_to_edit = keys_all[-1]
+            dict_to_edit = data
+
+            for i, e in enumerate(keys_to_final_dict):
+                path = tuple(keys_all[:i + 1])
 
-        dict_to_edit = self._data
+                if path not in copied:
+                    dict_to_edit[e] = dict(dict_to_edit[e])
+                    copied.add(path)
 
-        for e in keys_to_final_dict:
-            dict_to_edit = dict_to_edit[e]
+                dict_to_edit = dict_to_edit[e]
 
-        if dict_to_edit.get(key_to_edit) is None:
-            dotted_path = '.'.join(keys_all)
-            raise KeyError('Trying to replace key "{}" in env, '
-                           'but it does not exist'.format(dotted_path))
+            if dict_to_edit.get(key_to_edit) is None:
+                dotted_path = '.'.join(keys_all)
+                raise KeyError('Trying to replace key "{}" in env, '
+                               'but it does not exist'.format(dotted_path))
 
-        dict_to_edit[key_to_edit] = (self._expander.expand_raw_value(
-            value, keys_all))
+            dict_to_edit[key_to_edit] = (self._expander.expand_raw_value(
+                value, keys_all))
+
+        self._data = MappingProxyType(data)
+
+        for keys_all, _ in to_replace:
+            self._invalidate(keys_all[0])
 
     def _inplace_replace_flatten_key(self, value, key_flatten):
         """
@@ -226,14 +376,7 @@ class EnvDict(Mapping):
 
         Returns a copy
         """
-        # convert env__a__b__c -> ['a', 'b', 'c']
-        parts = key_flatten.split('__')
-
-        if parts[0] != 'env':
-            raise ValueError('keys_flatten must start with env__')
-
-        keys_all = parts[1:]
-        self._replace_value(value, keys_all)
+        self._replace_value(value, _split_flatten_key(key_flatten))
 
     def _replace_flatten_key(self, value, key_flatten):
         obj = copy(self)
@@ -245,8 +388,8 @@ class EnvDict(Mapping):
 
         Returns a copy
         """
-        for key, value in to_replace.items():
-            self._inplace_replace_flatten_key(value, key)
+        self._replace_values([(_split_flatten_key(key), value)
+                              for key, value in to_replace.items()])
 
     def _replace_flatten_keys(self, to_replace):
         obj = copy(self)
@@ -254,6 +397,76 @@ class EnvDict(Mapping):
         return obj
 
 
+def _root_found():
+    """
+    Returns True if there is a project root, looking up from the current
+    working directory. Finding the root requires walking up the filesystem, so
+    the root found from each working directory is cached.
+
+    Before using a cached root, it is verified with the same rules that found
+    it, and looked up again if it is no longer a valid root. Negative results
+    are not cached, so a project created afterwards (e.g., in a Jupyter
+    session) is detected
+    """
+    cwd = os.getcwd()
+    root = _ROOT_FOUND.get(cwd)
+
+    if root is not None:
+        try:
+            found = default.find_root_recursively(starting_dir=root,
+                                                  check_parents=False)
+        except Exception:
+            found = None
+
+        if found == root:
+            return True
+
+    root = default.try_to_find_root_recursively()
+
+    if root is None:
+        _ROOT_FOUND.pop(cwd, None)
+        return False
+
+    _ROOT_FOUND[cwd] = root
+    return True
+
+
+def _find_module_origin(module):
+    """
+    Returns the origin of a module (e.g., path/to/module/__init__.py) or None
+    if it cannot be found. Results are cached since finding the module
+    requires looking into sys.path, modules that are not found are not
+    cached since they may be installed afterwards
+    """
+    # the working directory is part of the key because the result depends
+    # on it if '' is in sys.path (e.g., in the REPL or in Jupyter)
+    key = (os.getcwd(), module)
+
+    if key not in _MODULE_ORIGIN:
+        module_spec = importlib.util.find_spec(module)
+
+        if module_spec is None:
+            return None
+
+        _MODULE_ORIGIN[key] = module_spec.origin
+
+    return _MODULE_ORIGIN[key]
+
+
+@lru_cache(maxsize=128)
+def _split_flatten_key(key_flatten):
+    """
+    Converts a flatten key into a tuple of keys, e.g.,
+    env__a__b__c -> ('a', 'b', 'c')
+    """
+    parts = key_flatten.split('__')
+
+    if parts[0] != 'env':
+        raise ValueError('keys_flatten must start with env__')
+
+    return tuple(parts[1:])
+
+
 def load_from_source(source):
     """
     Loads from a dictionary or a YAML and applies preprocesssing to the
@@ -262,37 +475,61 @@ def load_from_source(source):
     Returns
     -------
     dict
-        Raw dictioanry
+        Raw dictioanry, nested values must not be modified
     pathlib.Path
         Path to the loaded file, None if source is a dict
     str
         Name, if loaded from a YAML file with the env.{name}.yaml format,
         None if another format or if source is a dict
     """
-    if isinstance(source, Mapping):
+    # checking the type directly is much faster than isinstance with an
+    # abstract class, and source is a dictionary most of the time
+    if type(source) is dict:
         # dictiionary, path
         return source, None
+    elif isinstance(source, Mapping):
+        return dict(source), None
 
-    with open(str(source)) as f:
-        try:
-            raw = yaml.load(f, Loader=yaml.SafeLoader)
-        except Exception as e:
-            raise type(e)('yaml.load failed to parse your YAML file '
-                          'fix syntax errors and try again') from e
-        finally:
-            # yaml.load returns None for empty files and str if file just
-            # contains a string - those aren't valid for our use case, raise
-            # an error
-            if not isinstance(raw, Mapping):
-                raise ValueError("Expected object loaded from '{}' to be "
-                                 "a dict but got '{}' instead, "
-                                 "verify the content".format(
-                                     source,
-                                     type(raw).__name__))
+    raw = _safe_load(Path(source).read_text())
+
+    # yaml.load returns None for empty files and str if file just
+    # contains a string - those aren't valid for our use case, raise
+    # an error
+    if not isinstance(raw, Mapping):
+        raise ValueError("Expected object loaded from '{}' to be "
+                         "a dict but got '{}' instead, "
+                         "verify the content".format(source,
+                                                     type(raw).__name__))
 
     path = Path(source).resolve()
 
-    return raw, path
+    # as with dictionaries, nested values are shared (with the cache, in this
+    # case) so we only copy the top level, EnvironmentExpander copies the
+    # whole dictionary before modifying it
+    return dict(raw), path
+
+
+@lru_cache(maxsize=128)
+def _safe_load(content):
+    """
+    Parses YAML content. Results are cached by content, so loading the same
+    file more than once only parses it the first time. Callers must copy the
+    returned object before modifying it
+    """
+    try:
+        return yaml.load(content, Loader=SafeLoader)
+    except Exception as e:
+        raise type(e)('yaml.load failed to parse your YAML file '
+                      'fix syntax errors and try again') from e
+
+
+def clear_cache():
+    """Clears the cache of parsed YAML files, project roots and module
+    locations
+    """
+    _safe_load.cache_clear()
+    _ROOT_FOUND.clear()
+    _MODULE_ORIGIN.clear()
 
 
 def raw_preprocess(raw, path_to_raw):
@@ -344,15 +581,15 @@ def raw_preprocess(raw, path_to_raw):
 
             # must be a dotted path
             else:
-                module_spec = importlib.util.find_spec(module)
+                origin = _find_module_origin(module)
 
                 # package does not exist
-                if module_spec is None:
+                if origin is None:
                     raise ValueError('Could not resolve _module "{}", '
                                      'it is not a valid module '
                                      'nor a directory'.format(module))
                 else:
-                    path_to_module = Path(module_spec.origin).parent
+                    path_to_module = Path(origin).parent
 
             preprocessed['_module'] = path_to_module
 
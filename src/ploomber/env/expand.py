@@ -15,6 +15,9 @@ from ploomber.placeholders import util
 from ploomber import repo
 from ploomber.util import default
 
+# matches the __version__ = 'LITERAL' line in a package's __init__.py
+_VERSION_RE = re.compile(r'__version__\s+=\s+(.*)')
+
 
 def expand_raw_dictionary_and_extract_tags(raw, mapping):
     data = deepcopy(raw)
@@ -51,8 +54,21 @@ def expand_raw_dictionaries_and_extract_tags(raw, mapping):
     return expanded, tags_unique
 
 
+def _get_tags(value):
+    """
+    Returns the tags (e.g., {{tag}}) in a value. Values that are not strings,
+    or strings without "{{", "{%" or "[[", cannot contain tags, so they are
+    not parsed
+    """
+    if isinstance(value, str) and ('{{' in value or '{%' in value
+                                   or '[[' in value):
+        return util.get_tags_in_str(value)
+    else:
+        return set()
+
+
 def expand_if_needed(raw_value, mapping):
-    placeholders = util.get_tags_in_str(raw_value)
+    placeholders = _get_tags(raw_value)
 
     if not placeholders:
         value = raw_value
@@ -155,7 +171,7 @@ class EnvironmentExpander:
         furthermore, if raw_value ends with '/', a directory is created if
         it does not currently exist
         """
-        placeholders = util.get_tags_in_str(raw_value)
+        placeholders = _get_tags(raw_value)
 
         if not placeholders:
             value = raw_value
@@ -221,10 +237,7 @@ class EnvironmentExpander:
                            'placeholder')
 
         content = (self._preprocessed['_module'] / '__init__.py').read_text()
-
-        version_re = re.compile(r'__version__\s+=\s+(.*)')
-
-        version = str(ast.literal_eval(version_re.search(content).group(1)))
+        version = str(ast.literal_eval(_VERSION_RE.search(content).group(1)))
         return version
 
     def get_version(self):
@@ -10,6 +10,8 @@ class FrozenJSON(object):
     A facade for navigating a JSON-like object using attribute notation.
     Based on FrozenJSON from 'Fluent Python'
     """
+    __slots__ = ('_logger', '_path_to_file', '_data', '_wrapped')
+
     @classmethod
     def from_yaml(cls, path_to_file, *args, **kwargs):
         # load config file
@@ -40,10 +42,12 @@ class FrozenJSON(object):
 
     def __init__(self, mapping):
         self._logger = logging.getLogger(__name__)
-        self._logger.debug('Loaded with params: {}'.format(mapping))
+        self._logger.debug('Loaded with params: %s', mapping)
         self._path_to_file = None
 
         self._data = {}
+        # FrozenJSON objects for mapping values, created on first access
+        self._wrapped = {}
 
         for key, value in mapping.items():
             if keyword.iskeyword(key):
@@ -54,8 +58,17 @@ class FrozenJSON(object):
     def __getattr__(self, name):
         if hasattr(self._data, name):
             return getattr(self._data, name)
+        elif name in self._wrapped:
+            return self._wrapped[name]
         else:
-            return FrozenJSON(self._data[name])
+            value = FrozenJSON(self._data[name])
+
+            # only keep FrozenJSON objects, sequences are returned as new
+            # lists, which callers may modify
+            if isinstance(value, FrozenJSON):
+                self._wrapped[name] = value
+
+            return value
 
     def __dir__(self):
         return self._data.keys()
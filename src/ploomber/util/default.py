@@ -394,28 +394,62 @@ def find_file_recursively(name, max_levels_up=6, starting_dir=None):
     levels : int
         How many levels up the file is located
     """
+    return find_files_recursively([name],
+                                  max_levels_up=max_levels_up,
+                                  starting_dir=starting_dir)[name]
+
+
+def find_files_recursively(names, max_levels_up=6, starting_dir=None):
+    """
+    Find files by looking into the current folder and parent folders. Unlike
+    calling find_file_recursively once per file, it walks the parent folders
+    once and looks for all the files at each level
+
+    Parameters
+    ----------
+    names : iterable of str
+        Filenames
+
+    Returns
+    -------
+    dict
+        Maps each filename to a (path, levels) tuple, as returned by
+        find_file_recursively
+    """
     current_dir = starting_dir or os.getcwd()
     current_dir = Path(current_dir).resolve()
-    path_to_file = None
+    missing = list(dict.fromkeys(names))
+    found = {}
     levels = None
 
     for levels in range(max_levels_up):
-        current_path = Path(current_dir, name)
+        for name in missing:
+            current_path = Path(current_dir, name)
+
+            if current_path.exists():
+                found[name] = (current_path.resolve(), levels)
+
+        missing = [name for name in missing if name not in found]
 
-        if current_path.exists():
-            path_to_file = current_path.resolve()
+        if not missing:
             break
 
         current_dir = current_dir.parent
 
-    return path_to_file, levels
+    for name in missing:
+        found[name] = (None, levels)
+
+    return found
 
 
 def find_parent_of_file_recursively(name, max_levels_up=6, starting_dir=None):
     path, levels = find_file_recursively(name,
                                          max_levels_up=6,
                                          starting_dir=starting_dir)
+    return _parent_and_levels(path, levels)
+
 
+def _parent_and_levels(path, levels):
     if path:
         return path.parent, levels
 
@@ -447,14 +481,11 @@ def find_root_recursively(starting_dir=None,
                          '(e.g., pipeline.yaml), not a path '
                          '(e.g., path/to/pipeline.yaml)')
 
-    root_by_setup, setup_levels = find_parent_of_file_recursively(
-        'setup.py', max_levels_up=6, starting_dir=starting_dir)
-
-    root_by_pipeline, pipeline_levels = find_parent_of_file_recursively(
-        filename,
-        max_levels_up=6,
-        starting_dir=starting_dir,
-    )
+    found = find_files_recursively(['setup.py', filename],
+                                   max_levels_up=6,
+                                   starting_dir=starting_dir)
+    root_by_setup, setup_levels = _parent_and_levels(*found['setup.py'])
+    root_by_pipeline, pipeline_levels = _parent_and_levels(*found[filename])
 
     root_found = None
 
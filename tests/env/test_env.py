@@ -1,10 +1,11 @@
 import os
 import importlib
+from copy import copy, deepcopy
 from pathlib import Path
 import getpass
 import inspect
 import pickle
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 import pytest
 import yaml
@@ -13,7 +14,9 @@ import numpy as np
 from ploomber.env.env import Env
 from ploomber.env.decorators import with_env, load_env
 from ploomber.env import validate
-from ploomber.env.envdict import EnvDict
+from ploomber.env import envdict
+from ploomber.env.envdict import EnvDict, load_from_source
+from ploomber.env.frozenjson import FrozenJSON
 from ploomber.env import expand
 from ploomber.env.expand import (EnvironmentExpander, expand_raw_dictionary,
                                  cast_if_possible, iterate_nested_dict,
@@ -159,6 +162,40 @@ def test_init_with_module_key(cleanup_env):
     assert env._module == expected
 
 
+def test_caches_module_location(monkeypatch):
+    envdict.clear_cache()
+    expected = Path(importlib.util.find_spec('test_pkg').origin).parent
+    find_spec = Mock(wraps=importlib.util.find_spec)
+    monkeypatch.setattr(importlib.util, 'find_spec', find_spec)
+
+    EnvDict({'_module': 'test_pkg'})
+    env = EnvDict({'_module': 'test_pkg'})
+
+    find_spec.assert_called_once_with('test_pkg')
+    assert env._module == expected
+
+
+def test_module_location_depends_on_working_directory(tmp_directory,
+                                                      monkeypatch):
+    monkeypatch.syspath_prepend('')
+
+    for name in ['first', 'second']:
+        Path(name).mkdir()
+        Path(name, 'some_env_module.py').touch()
+
+    os.chdir('first')
+    importlib.invalidate_caches()
+    first = EnvDict({'_module': 'some_env_module'})
+
+    os.chdir(Path('..', 'second'))
+    importlib.invalidate_caches()
+    second = EnvDict({'_module': 'some_env_module'})
+
+    assert first._module.resolve() == Path(tmp_directory, 'first').resolve()
+    assert second._module.resolve() == Path(tmp_directory,
+                                            'second').resolve()
+
+
 def test_init_with_nonexistent_package(cleanup_env):
     with pytest.raises(ValueError) as exc_info:
         Env({'_module': 'i_do_not_exist'})
@@ -442,6 +479,18 @@ def test_expand_tags(monkeypatch, tmp_directory):
     }
 
 
+@pytest.mark.parametrize('value', [1, 1.5, True, None, 'value', '[1, 2]'])
+def test_expand_does_not_parse_values_without_tags(monkeypatch, value):
+    get_tags_in_str = Mock()
+    monkeypatch.setattr(expand.util, 'get_tags_in_str', get_tags_in_str)
+    expander = EnvironmentExpander(preprocessed={})
+
+    expanded = expander.expand_raw_dictionary({'key': value})
+
+    assert expanded == {'key': cast_if_possible(value)}
+    get_tags_in_str.assert_not_called()
+
+
 def test_error_if_no_project_root(tmp_directory):
     raw = {'root': '{{root}}'}
     expander = EnvironmentExpander(preprocessed={})
@@ -486,6 +535,55 @@ def test_serialize_env_dict():
     assert pickle.loads(pickle.dumps(env))
 
 
+def test_repr_is_updated_after_replacing_values():
+    env = EnvDict({'cwd': 'cwd', 'now': 'now', 'root': 'root', 'user': 1})
+    assert repr(env) == ("EnvDict({'cwd': 'cwd', 'now': 'now', "
+                         "'root': 'root', 'user': 1})")
+
+    env._inplace_replace_flatten_key(2, 'env__user')
+    assert repr(env) == ("EnvDict({'cwd': 'cwd', 'now': 'now', "
+                         "'root': 'root', 'user': 2})")
+
+
+def test_wraps_values_on_first_access(monkeypatch):
+    mappings = []
+
+    class SpyFrozenJSON(FrozenJSON):
+        def __init__(self, mapping):
+            mappings.append(mapping)
+            super().__init__(mapping)
+
+    monkeypatch.setattr(envdict, 'FrozenJSON', SpyFrozenJSON)
+    env = EnvDict({'a': {'b': 1}, 'c': 1})
+
+    assert mappings == []
+
+    assert env.a.b == 1
+    assert env['a'].b == 1
+    assert mappings == [{'b': 1}]
+
+
+def test_modifying_returned_list_does_not_modify_env():
+    env = EnvDict({'a': [1, 2]})
+    env.a.append(3)
+    env['a'].append(3)
+
+    assert env.a == [1, 2]
+    assert env['a'] == [1, 2]
+    assert copy(env).a == [1, 2]
+
+
+def test_pickle_keeps_values():
+    env = EnvDict({'a': {'b': 1}})
+    assert pickle.loads(pickle.dumps(env)).a.b == 1
+
+
+def test_setitem():
+    env = EnvDict({'a': 1})
+    env['a'] = {'b': 2}
+    assert env.a.b == 2
+
+
 def test_replace_flatten_key_env_dict():
     env = EnvDict({'a': 1})
     new_env = env._replace_flatten_key(2, 'env__a')
@@ -505,6 +603,58 @@ def test_replace_nested_flatten_keys_env_dict():
             and env is not new_env)  # must return a copy
 
 
+@pytest.mark.parametrize('copy_fn', [copy, deepcopy])
+def test_replace_flatten_keys_does_not_modify_original(copy_fn):
+    env = EnvDict({'a': {'b': {'c': 1}}})
+    new_env = copy_fn(env)
+    new_env._inplace_replace_flatten_keys({'env__a__b__c': 2})
+
+    assert new_env.a.b.c == 2
+    assert env.a.b.c == 1
+
+
+def test_deepcopy_does_not_share_nested_values():
+    env = EnvDict({'a': {'b': [1]}})
+    new_env = deepcopy(env)
+    new_env.a['b'].append(2)
+
+    assert new_env.a['b'] == [1, 2]
+    assert env.a['b'] == [1]
+
+
+def test_copy_shares_data_until_modified():
+    env = EnvDict({'a': {'b': 1}, 'c': {'d': 1}})
+    new_env = copy(env)
+
+    assert new_env._data is env._data
+
+    new_env._inplace_replace_flatten_key(2, 'env__a__b')
+
+    assert new_env._data['c'] is env._data['c']
+    assert new_env._data['a'] is not env._data['a']
+
+
+def test_replace_flatten_keys_validates_keys_before_replacing():
+    env = EnvDict({'a': 1, 'b': 1})
+
+    with pytest.raises(ValueError):
+        env._inplace_replace_flatten_keys({'env__a': 2, 'b': 2})
+
+    assert env.a == 1
+
+
+def test_replace_flatten_keys_does_not_replace_if_a_key_doesnt_exist():
+    env = EnvDict({'a': {'b': 1}})
+
+    with pytest.raises(KeyError):
+        env._inplace_replace_flatten_keys({
+            'env__a__b': 2,
+            'env__a__c': 2
+        })
+
+    assert env.a.b == 1
+
+
 def test_error_when_flatten_key_doesnt_exist():
     env = EnvDict({'a': 1})
     with pytest.raises(KeyError):
@@ -694,6 +844,41 @@ def test_error_when_loaded_obj_is_not_dict(content, type_, tmp_directory):
     assert str(excinfo.value) == expected
 
 
+def test_parses_file_once_if_content_does_not_change(tmp_directory,
+                                                     monkeypatch):
+    envdict.clear_cache()
+    load = Mock(wraps=yaml.load)
+    monkeypatch.setattr(yaml, 'load', load)
+    Path('env.yaml').write_text('key: 1')
+
+    EnvDict('env.yaml')
+    env = EnvDict('env.yaml')
+
+    assert env.key == 1
+    load.assert_called_once()
+
+
+def test_reloads_file_if_content_changes(tmp_directory):
+    path = Path('env.yaml')
+    path.write_text('key: 1')
+    raw, _ = load_from_source('env.yaml')
+    raw['key'] = 100
+
+    assert EnvDict('env.yaml').key == 1
+
+    path.write_text('key: 2')
+
+    assert EnvDict('env.yaml').key == 2
+
+
+def test_envs_loaded_from_the_same_file_are_independent(tmp_directory):
+    Path('env.yaml').write_text('a:\n  b: 1')
+    env = EnvDict('env.yaml')
+    env._inplace_replace_flatten_key(2, 'env__a__b')
+
+    assert EnvDict('env.yaml').a.b == 1
+
+
 def test_default(monkeypatch):
     monkeypatch.setattr(getpass, 'getuser', Mock(return_value='User'))
     monkeypatch.setattr(os, 'getcwd', Mock(return_value='/some_path'))
@@ -726,6 +911,58 @@ def test_default_with_root(monkeypatch):
     assert env.root == 'some_value'
 
 
+def test_caches_root_lookup(tmp_directory, monkeypatch):
+    Path('pipeline.yaml').touch()
+    mock = Mock(wraps=default.try_to_find_root_recursively)
+    monkeypatch.setattr(default, 'try_to_find_root_recursively', mock)
+
+    EnvDict(dict())
+    env = EnvDict(dict())
+
+    assert env.root == str(Path('.').resolve())
+    # calls with no arguments look up the root from the working directory,
+    # the expander makes additional ones to resolve {{root}}
+    assert [c for c in mock.call_args_list if c == call()] == [call()]
+
+
+def test_looks_up_root_again_if_cached_root_was_deleted(tmp_directory):
+    Path('pipeline.yaml').touch()
+    assert 'root' in EnvDict(dict())
+
+    Path('pipeline.yaml').unlink()
+    assert 'root' not in EnvDict(dict())
+
+
+def test_looks_up_root_again_if_cached_root_is_no_longer_valid(
+        tmp_directory):
+    Path('setup.py').touch()
+    Path('src', 'pkg').mkdir(parents=True)
+    Path('src', 'pkg', 'pipeline.yaml').touch()
+    assert 'root' in EnvDict(dict())
+
+    # a pipeline.yaml next to setup.py makes the layout ambiguous, so there
+    # is no root anymore
+    Path('pipeline.yaml').touch()
+    assert 'root' not in EnvDict(dict())
+
+
+def test_finds_root_created_after_failed_lookup(tmp_directory):
+    assert 'root' not in EnvDict(dict())
+
+    Path('pipeline.yaml').touch()
+    assert EnvDict(dict()).root == str(Path('.').resolve())
+
+
+def test_does_not_look_up_root_if_passed(monkeypatch):
+    mock = Mock(return_value=None)
+    monkeypatch.setattr(default, 'try_to_find_root_recursively', mock)
+
+    env = EnvDict({'root': 'some_value'})
+
+    assert env.root == 'some_value'
+    mock.assert_not_called()
+
+
 @pytest.mark.parametrize('kwargs, expected', [
     [
         dict(source={'cwd': 'some_value'}, path_to_here='value'),
@@ -754,6 +991,15 @@ def test_adds_default_keys_if_they_dont_exist(monkeypatch):
     assert env.default_keys == {'cwd', 'here', 'user', 'root', 'now'}
 
 
+def test_defaults_are_overridden_by_source():
+    source = {'a': 1}
+    env = EnvDict(source, defaults={'a': 0, 'b': 2, 'cwd': 'some_value'})
+
+    assert (env.a, env.b, env.cwd) == (1, 2, 'some_value')
+    assert 'cwd' not in env.default_keys
+    assert source == {'a': 1}
+
+
 def test_find(tmp_directory):
     path = Path('some', 'dir')
     path.mkdir(parents=True)
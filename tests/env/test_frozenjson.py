@@ -13,6 +13,20 @@ def test_init_from_dict():
     assert str(d) == str(d_raw)
 
 
+def test_reuses_nested_objects():
+    d = FrozenJSON({'a': {'b': {'c': 1}}})
+
+    assert d.a is d.a
+    assert d.a.b is d.a.b
+
+
+def test_does_not_reuse_lists():
+    d = FrozenJSON({'a': {'b': [1]}})
+    d.a.b.append(2)
+
+    assert d.a.b == [1]
+
+
 def test_init_from_yaml(tmp_directory):
     Path('some.yaml').write_text('a:\n  b: 1')
 
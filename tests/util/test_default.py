@@ -263,6 +263,23 @@ def test_path_to_env_error_if_dir(tmp_directory):
     assert str(excinfo.value) == expected
 
 
+def test_find_files_recursively(tmp_directory):
+    Path('setup.py').touch()
+    Path('path', 'to').mkdir(parents=True)
+    Path('path', 'pipeline.yaml').touch()
+    os.chdir(Path('path', 'to'))
+
+    found = default.find_files_recursively(
+        ['pipeline.yaml', 'setup.py', 'missing.yaml'])
+
+    assert found == {
+        'pipeline.yaml': (Path(tmp_directory, 'path',
+                               'pipeline.yaml').resolve(), 1),
+        'setup.py': (Path(tmp_directory, 'setup.py').resolve(), 2),
+        'missing.yaml': (None, 5),
+    }
+
+
 def test_finds_pipeline_yaml(tmp_directory):
     expected = Path(tmp_directory).resolve()
     pip = Path('pipeline.yaml').resolve()